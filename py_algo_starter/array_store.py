@@ -0,0 +1,267 @@
+import json
+import os
+from typing import Iterable, Optional
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+
+from .utils import resample_ohlcv, add_pct_change
+from .indicators_pack import compute_indicators
+from .signal_engine import compute_signal_scores
+
+# Columnas mínimas que necesita IndicatorStrategy (OHLCV + score precalculado)
+STORE_COLUMNS = ["open", "high", "low", "close", "volume", "score_total"]
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+META_FILE = "meta.json"
+
+# datetime(1970, 1, 1).toordinal() → base de bt.date2num para epoch UTC
+_EPOCH_ORDINAL = 719163.0
+_NS_PER_DAY = 86_400 * 1_000_000_000
+
+# Con adjust=False el peso de la semilla de una EMA cae como (1 - 2/(span+1))^n;
+# 20 spans lo dejan debajo de la precisión de float64.
+_EMA_WARMUP_SPANS = 20
+
+
+def _column_path(store_dir: str, name: str) -> str:
+    return os.path.join(store_dir, f"{name}.bin")
+
+
+def _warmup_rows(features: dict) -> int:
+    """Barras previas necesarias para que indicadores y score no dependan del corte."""
+    rows = [2]
+    if "rsi" in features:
+        rows.append(int(features["rsi"].get("period", 14)) + 1)
+    if "ema" in features:
+        span = max(int(features["ema"].get("fast", 12)),
+                   int(features["ema"].get("slow", 26)))
+        rows.append(_EMA_WARMUP_SPANS * span)
+    if "atr" in features:
+        # +1 por el shift del close y +1 por el pct_change del score
+        rows.append(int(features["atr"].get("period", 14)) + 2)
+    return max(rows)
+
+
+def store_params(cfg: dict, csv_path: str) -> dict:
+    """Todo lo que determina el contenido del store: si cambia, hay que reconstruir."""
+    st = os.stat(csv_path)
+    return {
+        "csv_path": os.path.abspath(csv_path),
+        "csv_size": st.st_size,
+        "csv_mtime_ns": st.st_mtime_ns,
+        "timeframe": cfg["data"]["timeframe"],
+        "datetime_col": cfg["data"]["datetime_col"],
+        "tz": cfg["data"]["tz"],
+        "features": cfg["features"],
+        "weights": cfg["signals"]["weights"],
+    }
+
+
+def load_store_meta(store_dir: str) -> Optional[dict]:
+    """Devuelve meta.json del store, o None si el store no existe o quedó incompleto."""
+    path = os.path.join(store_dir, META_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class _StoreWriter:
+    """Appendea chunks como binarios crudos (int64 ns / float64) por columna."""
+
+    def __init__(self, store_dir: str, datetime_col: str,
+                 columns: Iterable[str] = STORE_COLUMNS):
+        os.makedirs(store_dir, exist_ok=True)
+        # meta.json se escribe al final: si falta, el store no se considera válido
+        meta_path = os.path.join(store_dir, META_FILE)
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        self.store_dir = store_dir
+        self.datetime_col = datetime_col
+        self.columns = list(columns)
+        self.rows = 0
+        self._fhs = {c: open(_column_path(store_dir, c), "wb")
+                     for c in ["datetime", *self.columns]}
+
+    def append(self, df: pd.DataFrame):
+        if df.empty:
+            return
+        # Normalizamos a ns explícitamente: el reader asume esa unidad
+        dt = pd.to_datetime(df[self.datetime_col], utc=True).dt.as_unit("ns")
+        dt.astype("int64").to_numpy().tofile(self._fhs["datetime"])
+        for c in self.columns:
+            df[c].to_numpy(dtype="float64").tofile(self._fhs[c])
+        self.rows += len(df)
+
+    def close(self, params: dict):
+        for fh in self._fhs.values():
+            fh.close()
+        meta = {
+            "rows": self.rows,
+            "columns": self.columns,
+            "datetime_unit": "ns",
+            "params": params,
+        }
+        with open(os.path.join(self.store_dir, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+
+def build_array_store(csv_path: str, store_dir: str, cfg: dict,
+                      chunk_size: int = 50_000) -> str:
+    """
+    Construye el store leyendo el CSV por chunks, sin materializar el histórico.
+    Replica resample → ret1 → indicadores → score → dropna de run_once:
+      - las velas del último bucket de cada chunk se arrastran al siguiente
+        para no partir un bucket del resample;
+      - se arrastran `_warmup_rows` barras ya resampleadas para que RSI/EMA/ATR
+        y el score den lo mismo que sobre la serie completa.
+    Asume el CSV ordenado por fecha (como lo deja fetch_data).
+    """
+    dt_col = cfg["data"]["datetime_col"]
+    tz = cfg["data"]["tz"]
+    timeframe = cfg["data"]["timeframe"]
+    features = cfg["features"]
+    weights = cfg["signals"]["weights"]
+    warmup = _warmup_rows(features)
+
+    writer = _StoreWriter(store_dir, dt_col)
+    raw_carry = None
+    bars_carry = None
+
+    def process(bars: pd.DataFrame):
+        nonlocal bars_carry
+        if bars.empty:
+            return
+        n_carry = 0 if bars_carry is None else len(bars_carry)
+        frame = bars if not n_carry else pd.concat([bars_carry, bars])
+        frame = frame.reset_index(drop=True)
+        out = add_pct_change(frame)
+        out = compute_indicators(out, features)
+        out = compute_signal_scores(out, weights)
+        writer.append(out.iloc[n_carry:].dropna())
+        bars_carry = frame[[dt_col, *OHLCV_COLUMNS]].tail(warmup)
+
+    for chunk in pd.read_csv(csv_path, chunksize=int(chunk_size)):
+        if dt_col in chunk.columns:
+            chunk[dt_col] = pd.to_datetime(
+                chunk[dt_col], utc=True).dt.tz_convert(tz)
+        if raw_carry is not None:
+            chunk = pd.concat([raw_carry, chunk], ignore_index=True)
+        bars = resample_ohlcv(chunk, timeframe, dt_col)
+        if bars.empty:
+            raw_carry = chunk
+            continue
+        last_bucket = bars[dt_col].iloc[-1]
+        raw_carry = chunk[chunk[dt_col] >= last_bucket]
+        process(bars.iloc[:-1])
+
+    if raw_carry is not None and not raw_carry.empty:
+        process(resample_ohlcv(raw_carry, timeframe, dt_col))
+
+    writer.close(store_params(cfg, csv_path))
+    print(f"[STORE] Built {store_dir} (rows={writer.rows}) from {csv_path}")
+    return store_dir
+
+
+def ensure_array_store(csv_path: str, store_dir: str, cfg: dict,
+                       chunk_size: int = 50_000, rebuild: bool = False) -> str:
+    """Reusa el store si corresponde al CSV y config actuales; si no, lo reconstruye."""
+    meta = load_store_meta(store_dir)
+    if not rebuild and meta is not None and \
+            meta.get("params") == json.loads(json.dumps(store_params(cfg, csv_path))):
+        print(f"[STORE] Reusing {store_dir} (rows={meta['rows']})")
+        return store_dir
+    return build_array_store(csv_path, store_dir, cfg, chunk_size=chunk_size)
+
+
+def open_array_store(store_dir: str,
+                     columns: Iterable[str] = STORE_COLUMNS) -> dict:
+    """Abre las columnas del store como memmaps de solo lectura."""
+    meta = load_store_meta(store_dir)
+    if meta is None:
+        raise FileNotFoundError(f"No valid array store at {store_dir}")
+    if meta.get("datetime_unit") != "ns":
+        raise ValueError(f"Unsupported datetime unit: {meta.get('datetime_unit')}")
+    rows = int(meta["rows"])
+    out = {}
+    for c in ["datetime", *columns]:
+        dtype = "int64" if c == "datetime" else "float64"
+        if rows == 0:
+            out[c] = np.empty(0, dtype=dtype)
+        else:
+            out[c] = np.memmap(_column_path(store_dir, c), dtype=dtype,
+                               mode="r", shape=(rows,))
+    return out
+
+
+def read_array_store(store_dir: str, tz: str = "UTC",
+                     columns: Iterable[str] = STORE_COLUMNS,
+                     tail: Optional[int] = None) -> pd.DataFrame:
+    """
+    Materializa el store (o sus últimas `tail` filas) como DataFrame
+    indexado por datetime, p. ej. para el reporte y el advice.
+    """
+    cols = open_array_store(store_dir, columns)
+    sl = slice(-tail, None) if tail else slice(None)
+    idx = pd.to_datetime(np.asarray(cols.pop("datetime")[sl]), unit="ns", utc=True)
+    data = {c: np.asarray(arr[sl]) for c, arr in cols.items()}
+    return pd.DataFrame(data, index=idx.tz_convert(tz).rename("datetime"))
+
+
+class ArrayStoreData(bt.feed.DataBase):
+    """
+    Feed de Backtrader que lee las barras del array store por chunks.
+    Sólo mantiene en memoria `chunk_size` filas por columna, en lugar del
+    DataFrame completo que requiere PandasData.
+    """
+    lines = ('score_total',)
+    params = (
+        ('store_dir', None),
+        ('chunk_size', 50_000),
+    )
+
+    def start(self):
+        super().start()
+        self._cols = open_array_store(self.p.store_dir)
+        self._n = len(self._cols["datetime"])
+        self._pos = 0
+        self._chunk = None
+        self._i = 0
+
+    def stop(self):
+        super().stop()
+        self._cols = None
+        self._chunk = None
+
+    def _load_chunk(self):
+        end = min(self._pos + int(self.p.chunk_size), self._n)
+        sl = slice(self._pos, end)
+        chunk = {c: np.asarray(arr[sl]) for c, arr in self._cols.items()}
+        # Conversión vectorizada ns UTC → número de fecha de Backtrader
+        chunk["datetime"] = (_EPOCH_ORDINAL
+                             + chunk["datetime"].astype("float64") / _NS_PER_DAY)
+        self._chunk = chunk
+        self._i = 0
+
+    def _load(self):
+        if self._pos >= self._n:
+            return False
+        if self._chunk is None or self._i >= len(self._chunk["datetime"]):
+            self._load_chunk()
+
+        i = self._i
+        ch = self._chunk
+        self.lines.datetime[0] = ch["datetime"][i]
+        self.lines.open[0] = ch["open"][i]
+        self.lines.high[0] = ch["high"][i]
+        self.lines.low[0] = ch["low"][i]
+        self.lines.close[0] = ch["close"][i]
+        self.lines.volume[0] = ch["volume"][i]
+        self.lines.openinterest[0] = 0.0
+        self.lines.score_total[0] = ch["score_total"][i]
+
+        self._i += 1
+        self._pos += 1
+        return True
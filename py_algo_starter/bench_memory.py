@@ -0,0 +1,134 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from .utils import load_config
+from .array_store import ArrayStoreData, load_store_meta
+from .run_backtest import PandasDataExt, build_cerebro, prepare_frame, prepare_array_store
+
+MODES = ("pandas", "lowmem", "lowmem-reuse")
+
+
+def _write_synthetic_csv(path: str, bars: int, chunk: int = 200_000, seed: int = 7):
+    """Random walk de velas 1m escrito por chunks, sin depender de la red."""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2018-01-01", tz="UTC")
+    last = 100.0
+    for off in range(0, bars, chunk):
+        n = min(chunk, bars - off)
+        close = last * np.exp(np.cumsum(rng.normal(0, 1e-3, n)))
+        spread = np.abs(rng.normal(0, 5e-4, n)) * close
+        pd.DataFrame({
+            "datetime": pd.date_range(start + pd.Timedelta(minutes=off),
+                                      periods=n, freq="min"),
+            "open": np.r_[last, close[:-1]],
+            "high": close + spread,
+            "low": close - spread,
+            "close": close,
+            "volume": rng.uniform(1, 100, n),
+        }).to_csv(path, mode="a" if off else "w", header=not off, index=False)
+        last = close[-1]
+
+
+def _peak_rss_mb() -> float:
+    # VmHWM se resetea en exec; ru_maxrss en cambio hereda el pico del padre
+    try:
+        with open("/proc/self/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    # Fallback (no Linux): ru_maxrss, en KB en Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def _run_child(mode: str, cfg: dict) -> dict:
+    """Mismos pasos que run_once hasta cerebro.run() (sin reporte ni upload)."""
+    t0 = time.perf_counter()
+    low_memory = mode != "pandas"
+    cerebro = build_cerebro(cfg, low_memory=low_memory)
+    if low_memory:
+        store_dir = prepare_array_store(cfg, rebuild=(mode == "lowmem"))
+        feed = ArrayStoreData(
+            store_dir=store_dir,
+            chunk_size=int(cfg["backtest"].get("chunk_size", 50_000)))
+        bars = load_store_meta(store_dir)["rows"]
+    else:
+        df = prepare_frame(cfg, cfg["data"]["csv_path"])
+        data = df.copy()
+        data.set_index("datetime", inplace=True)
+        feed = PandasDataExt(dataname=data)
+        bars = len(data)
+    cerebro.adddata(feed)
+
+    t1 = time.perf_counter()
+    cerebro.run()
+    t2 = time.perf_counter()
+
+    return {
+        "mode": mode,
+        "bars": bars,
+        "prepare_seconds": round(t1 - t0, 3),
+        "run_seconds": round(t2 - t1, 3),
+        "bars_per_sec": round(bars / (t2 - t1), 1) if t2 > t1 else None,
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "final_value": round(cerebro.broker.getvalue(), 2),
+    }
+
+
+def main():
+    """
+    Compara pico de RSS y barras/seg del pipeline de run_once (CSV →
+    indicadores/score → cerebro.run) entre el path PandasData y el modo
+    low_memory, tanto construyendo el store como reusándolo. Cada modo
+    corre en su propio subproceso y reporta su VmHWM.
+    """
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--config", default="config.yaml")
+    ap.add_argument("--bars", type=int, default=1_000_000)
+    ap.add_argument("--timeframe", default="1min")
+    ap.add_argument("--workdir", default=None,
+                    help="directorio para CSV/store (default: temporal, se borra)")
+    ap.add_argument("--child", choices=MODES, default=None)
+    args = ap.parse_args()
+
+    if args.child:
+        cfg = load_config(args.config)
+        cfg["data"].update(csv_path=os.path.join(args.workdir, "bench.csv"),
+                           auto_fetch=False, timeframe=args.timeframe,
+                           tz="UTC")
+        cfg["backtest"]["store_dir"] = os.path.join(args.workdir, "bench_store")
+        print(json.dumps(_run_child(args.child, cfg)))
+        return
+
+    with tempfile.TemporaryDirectory(prefix="bench_lowmem_") as tmp:
+        workdir = args.workdir or tmp
+        os.makedirs(workdir, exist_ok=True)
+        _write_synthetic_csv(os.path.join(workdir, "bench.csv"), args.bars)
+        print(f"[BENCH] workdir={workdir} bars={args.bars} timeframe={args.timeframe}")
+
+        for mode in MODES:
+            cmd = [sys.executable, "-m", "py_algo_starter.bench_memory",
+                   "--config", args.config, "--timeframe", args.timeframe,
+                   "--workdir", workdir, "--child", mode]
+            r = subprocess.run(cmd, capture_output=True, text=True)
+            if r.returncode != 0:
+                print(f"[BENCH] {mode} failed (rc={r.returncode}): {r.stderr.strip()}")
+                continue
+            res = json.loads(r.stdout.strip().splitlines()[-1])
+            print(f"[BENCH] {res['mode']:>12}: peak_rss={res['peak_rss_mb']} MB "
+                  f"prepare={res['prepare_seconds']}s "
+                  f"bars/sec={res['bars_per_sec']} final_value={res['final_value']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ from .indicators_pack import compute_indicators
 from .fetch_data import auto_fetch_to_csv
 from .signal_engine import compute_signal_scores, compute_entry_exit_advice, render_advice_html
 from .strategy_bt import IndicatorStrategy
+from .array_store import ArrayStoreData, ensure_array_store, read_array_store
 from .env import WEB_SERVICE_BASE_URL, UPLOAD_TOKEN, REPORTS_DIR
 
 
@@ -71,27 +72,19 @@ def _upload_report(report_path: str, filename: str = "report.html"):
         return None
 
 
-def run_once(config_path: str = "config.yaml"):
+def build_cerebro(cfg: dict, low_memory: bool = False) -> bt.Cerebro:
     """
-    Ejecuta el pipeline completo:
-      - fetch/resample/indicadores/señales
-      - backtest con Backtrader
-      - genera QuantStats HTML en REPORTS_DIR
-      - intenta subir el reporte al web-service
-    Devuelve: (report_path_local, public_url_o_None)
+    Arma Cerebro con la estrategia y el broker según config.
+    En modo low_memory desactiva los observers estándar y usa
+    `exactbars` (default 1) para que los line buffers queden acotados.
     """
-    cfg = load_config(config_path)
-
-    csv_auto = auto_fetch_to_csv(cfg)
-    df = read_csv(csv_auto, cfg["data"]["datetime_col"], cfg["data"]["tz"])
-    df = resample_ohlcv(df, cfg["data"]["timeframe"],
-                        cfg["data"]["datetime_col"])
-    df = add_pct_change(df)
-    df = compute_indicators(df, cfg["features"])
-    df = compute_signal_scores(df, cfg["signals"]["weights"])
-    df = df.dropna().reset_index(drop=True)
-
-    cerebro = bt.Cerebro()
+    if low_memory:
+        cerebro = bt.Cerebro(
+            stdstats=False,
+            exactbars=int(cfg["backtest"].get("exactbars", 1)),
+        )
+    else:
+        cerebro = bt.Cerebro()
     cerebro.addstrategy(
         IndicatorStrategy,
         long_min_score=cfg["signals"]["thresholds"]["long_min_score"],
@@ -103,13 +96,69 @@ def run_once(config_path: str = "config.yaml"):
         partial_tp=cfg["risk"]["partial_tp"],
         printlog=cfg["backtest"]["printlog"],
     )
-
-    data = df.copy()
-    data.set_index("datetime", inplace=True)
-    feed = PandasDataExt(dataname=data)
-    cerebro.adddata(feed)
     cerebro.broker.setcash(cfg["backtest"]["cash"])
     cerebro.broker.setcommission(commission=cfg["backtest"]["commission"])
+    return cerebro
+
+
+def prepare_frame(cfg: dict, csv_path: str):
+    """resample → ret1 → indicadores → score sobre el CSV completo en memoria."""
+    df = read_csv(csv_path, cfg["data"]["datetime_col"], cfg["data"]["tz"])
+    df = resample_ohlcv(df, cfg["data"]["timeframe"],
+                        cfg["data"]["datetime_col"])
+    df = add_pct_change(df)
+    df = compute_indicators(df, cfg["features"])
+    df = compute_signal_scores(df, cfg["signals"]["weights"])
+    return df.dropna().reset_index(drop=True)
+
+
+def prepare_array_store(cfg: dict, rebuild: bool = False) -> str:
+    """
+    Deja listo el array store del modo low_memory y devuelve su path.
+    Con data.auto_fetch=false usa el CSV existente; el store se reusa
+    mientras CSV y config (timeframe/features/weights) no cambien.
+    """
+    if cfg["data"].get("auto_fetch", True):
+        csv_path = auto_fetch_to_csv(cfg)
+    else:
+        csv_path = cfg["data"]["csv_path"]
+    store_dir = cfg["backtest"].get("store_dir") or \
+        os.path.splitext(csv_path)[0] + "_store"
+    return ensure_array_store(
+        csv_path, store_dir, cfg,
+        chunk_size=int(cfg["backtest"].get("chunk_size", 50_000)),
+        rebuild=rebuild or bool(cfg["backtest"].get("rebuild_store", False)),
+    )
+
+
+def run_once(config_path: str = "config.yaml"):
+    """
+    Ejecuta el pipeline completo:
+      - fetch/resample/indicadores/señales
+      - backtest con Backtrader
+      - genera QuantStats HTML en REPORTS_DIR
+      - intenta subir el reporte al web-service
+    Devuelve: (report_path_local, public_url_o_None)
+    """
+    cfg = load_config(config_path)
+
+    low_memory = bool(cfg["backtest"].get("low_memory", False))
+    cerebro = build_cerebro(cfg, low_memory=low_memory)
+
+    if low_memory:
+        # El histórico nunca se materializa: el store se construye por chunks
+        # (o se reusa) y el feed lo lee por chunks con line buffers acotados.
+        store_dir = prepare_array_store(cfg)
+        feed = ArrayStoreData(
+            store_dir=store_dir,
+            chunk_size=int(cfg["backtest"].get("chunk_size", 50_000)))
+    else:
+        csv_auto = auto_fetch_to_csv(cfg)
+        df = prepare_frame(cfg, csv_auto)
+        data = df.copy()
+        data.set_index("datetime", inplace=True)
+        feed = PandasDataExt(dataname=data)
+    cerebro.adddata(feed)
     cerebro.run()
 
     value = cerebro.broker.getvalue()
@@ -122,6 +171,8 @@ def run_once(config_path: str = "config.yaml"):
 
     # De momento usamos retornos simples de close; si querés PnL real, luego
     # agregamos Analyzer y construimos la serie de returns de la equity curve.
+    if low_memory:
+        data = read_array_store(store_dir, cfg["data"]["tz"], columns=["close"])
     ret = data["close"].pct_change().fillna(0.0)
     qs.reports.html(ret, output=report_path, title="Strategy Report")
     # Append actionable advice to the HTML
@@ -141,7 +192,13 @@ def run_once(config_path: str = "config.yaml"):
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--config", default="config.yaml")
+    ap.add_argument("--build-store", action="store_true",
+                    help="solo (re)construye el array store del modo low_memory")
     args = ap.parse_args()
+    if args.build_store:
+        store_dir = prepare_array_store(load_config(args.config), rebuild=True)
+        print(f"[OK] Store: {store_dir}")
+        return
     path, url = run_once(args.config)
     print(f"[OK] Report: {path}")
     if url:
@@ -33,9 +33,6 @@ def read_csv(path: str, datetime_col: str, tz: str = "UTC") -> pd.DataFrame:
 
 
 def resample_ohlcv(df, timeframe: str, datetime_col: str):
-    # Normalize pandas offset alias to lowercase to avoid FutureWarning for 'h'
-    if isinstance(rule, str):
-        rule = rule.lower()
     df = df.copy()
     df = df.set_index(datetime_col).sort_index()
     rule = timeframe.lower()